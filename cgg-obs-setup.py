@@ -1,37 +1,71 @@
-from bs4 import BeautifulSoup
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from fnmatch import fnmatch
-from glob import glob
+from fnmatch import translate
+from functools import lru_cache, partial
+from glob import iglob
 from os.path import basename, dirname
 from pathlib import Path
-from win32com.client import Dispatch
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import argparse
-import inspect
+import errno
+import hashlib
+import importlib.util
 import json
 import logging
+import mmap
 import os
-import py7zr
+import re
 import requests
 import shutil
+import subprocess
 import sys
-import winshell
+import tarfile
+import time
 import zipfile
 
+# lxml is a C parser and much faster than the pure-Python html.parser; use it if
+# installed. BeautifulSoup imports it itself, so only check that it's there.
+if importlib.util.find_spec("lxml"):
+    html_parser = "lxml"
+else:
+    html_parser = "html.parser"
+
+# orjson is a much faster JSON (de)serializer; fall back to the json module without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# zstandard is only needed for .tar.zst archives, which decompress far faster than zip
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class archiveMap(mmap.mmap):
+    # mmap only gained seekable() in Python 3.13, and ZipFile needs it to read members
+    def seekable(self):
+        return True
+
 
 class cggOBS:
     def __init__(self, **kwargs):
-        logging.debug(f"...")
-        logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
         for name, value in kwargs.items():
-            logging.debug(f"  {name}: {value}")
+            logging.debug("  %s: %s", name, value)
 
         downloads = kwargs.get("downloads")
         self.branding = kwargs.get("branding")
+        self.download_workers = kwargs.get("download_workers", 8)
         self.github_api = kwargs.get("github_api_key")
         self.installation_directory = Path(kwargs.get("target"))
         self.downloads_directory = self.define_downloads_dir(downloads)
         self.obs_binary = f"{self.installation_directory}/bin/64bit/obs64.exe"
+        self.installed_markers_directory = self.installation_directory / ".cgg-installed"
         # create a file name with the current date and time
         self.date_str = datetime.now().strftime("%Y%m%d%H%M%S")
 
@@ -42,18 +76,43 @@ class cggOBS:
         self.installed_versions_file = Path(f"{self.downloads_directory}/versions.json")
         self.installed_versions = read_json_file(self.installed_versions_file)
 
+        # GitHub release responses, kept between runs for conditional requests
+        self.github_cache_file = Path(f"{self.downloads_directory}/github_cache.json")
+        self.github_cache = read_json_file(self.github_cache_file)
+
+        # obsproject.com download page listings, kept the same way
+        self.obsproject_cache_file = Path(
+            f"{self.downloads_directory}/obsproject_cache.json"
+        )
+        self.obsproject_cache = read_json_file(self.obsproject_cache_file)
+
+        # Config files fetched by URL, kept for conditional requests on the next run
+        self.config_cache_file = Path(f"{self.downloads_directory}/config_cache.json")
+        self.config_cache = read_json_file(self.config_cache_file)
+
         # load our config file
         self.json_data = self.load_obs_json(kwargs.get("json_file", "__invalid__"))
 
+        # Use a native 7-Zip for .7z archives unless the config opts out
+        self.use_native_7z = self.json_data.get("use_native_7z", True)
+
+        # Archive extractors by file extension
+        self.archive_extractors = {
+            ".7z": partial(extract_7z, use_native=self.use_native_7z),
+            ".zip": extract_zip,
+            # Only zstandard-compressed tarballs; a bare .zst file isn't an archive
+            ".tar.zst": extract_tar_zst,
+        }
+
         # define our icon into
         self.define_icon()
 
     def define_downloads_dir(self, downloads):
         # Set our downloads directory
-        logging.debug(f"...")
-        logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
         for name, value in locals().items():
-            logging.debug(f"  {name}: {value}")
+            logging.debug("  %s: %s", name, value)
 
         if downloads == "__invalid__":
             return Path(f"{self.installation_directory}/downloads")
@@ -62,10 +121,10 @@ class cggOBS:
 
     def define_icon(self):
         # Define our icon info
-        logging.debug(f"...")
-        logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
         for name, value in locals().items():
-            logging.debug(f"  {name}: {value}")
+            logging.debug("  %s: %s", name, value)
 
         # This is what we'll use for defaults
         default_branding_info = {
@@ -93,10 +152,10 @@ class cggOBS:
 
     def download_icon(self):
         # Dowload the icon for the Desktop icon
-        logging.debug(f"...")
-        logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
         for name, value in locals().items():
-            logging.debug(f"  {name}: {value}")
+            logging.debug("  %s: %s", name, value)
 
         # Set our download dictionary
         download_this = {
@@ -107,90 +166,184 @@ class cggOBS:
 
         download_file(**download_this)
 
-    def download_objects(self):
-        # Download objects as defined in the config
-        logging.debug(f"...")
-        logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+    def download_object(self, this_object, values):
+        # Resolve and download a single object from the config. Returns its download status, or None if nothing was downloaded.
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
         for name, value in locals().items():
-            logging.debug(f"  {name}: {value}")
+            logging.debug("  %s: %s", name, value)
 
-        # Iterate through the download objects
-        for this_object, values in self.json_data.get(
-            "downloads", defaultdict(lambda: defaultdict(dict))
-        ).items():
-            filename_pattern = values.get("filename", False)
-            force_download = values.get("force_download", False)
-            latest = values.get("latest", True)
-            if not filename_pattern:
-                continue
+        filename_pattern = values.get("filename", False)
+        force_download = values.get("force_download", False)
+        latest = values.get("latest", True)
+        if not filename_pattern:
+            return None
 
-            tag = None
+        tag = None
 
-            if "obsproject" in values:
-                this_url, filename = get_obs_project_download_url(
-                    values.get("obsproject"), filename_pattern
-                )
-            elif "github" in values:
-                this_url, filename, tag = get_github_project_download_url(
-                    values.get("github"), filename_pattern, latest, self.github_api
-                )
-                logging.debug(this_url)
-                logging.debug(filename)
-                logging.debug(tag)
-            else:  # Let's possibly put direct downloads here at a future update
-                continue
+        if "obsproject" in values:
+            this_url, filename = get_obs_project_download_url(
+                values.get("obsproject"), filename_pattern, self.obsproject_cache
+            )
+        elif "github" in values:
+            this_url, filename, tag = get_github_project_download_url(
+                values.get("github"),
+                filename_pattern,
+                latest,
+                self.github_api,
+                self.github_cache,
+            )
+            logging.debug(this_url)
+            logging.debug(filename)
+            logging.debug(tag)
+        else:  # Let's possibly put direct downloads here at a future update
+            return None
 
-            download_this = {
-                "output_directory": self.downloads_directory,
-                "output_filename": filename,
-                "url": this_url,
-            }
+        download_this = {
+            "output_directory": self.downloads_directory,
+            "output_filename": filename,
+            "url": this_url,
+        }
 
-            if "github" in values:
-                download_this["api_key"] = self.github_api
+        if "github" in values:
+            download_this["api_key"] = self.github_api
+
+        installed_versions_object = self.installed_versions.get(
+            this_object, defaultdict(lambda: defaultdict(dict))
+        )
+        installed_version = installed_versions_object.get("filename", False)
+        installed_tag = installed_versions_object.get("tag", False)
 
-            installed_versions_object = self.installed_versions.get(
-                this_object, defaultdict(lambda: defaultdict(dict))
+        installed_matches = installed_version == filename
+        static_name = not ("?" in filename_pattern or "*" in filename_pattern)
+
+        if tag == None:
+            tags_match = True
+        elif tag == installed_tag:
+            tags_match = True
+        else:
+            tags_match = False
+
+        # obsproject files carry no release tag, so ask the server whether a forced
+        # download would actually fetch anything different from what's installed
+        remote_file_info = dict()
+        if force_download and "obsproject" in values:
+            remote_file_info = get_remote_file_info(this_url)
+
+        download = False
+        if not tags_match:
+            download = True
+        elif not installed_matches:
+            download = True
+        elif force_download:
+            download = not remote_file_info or any(
+                installed_versions_object.get(key) != value
+                for key, value in remote_file_info.items()
             )
-            installed_version = installed_versions_object.get("filename", False)
-            installed_tag = installed_versions_object.get("tag", False)
 
-            installed_matches = installed_version == filename
-            static_name = not ("?" in filename_pattern or "*" in filename_pattern)
+        if not download:
+            return None
 
-            if tag == None:
-                tags_match = True
-            elif tag == installed_tag:
-                tags_match = True
-            else:
-                tags_match = False
+        # The archive is hashed while it downloads, so it needn't be read back later
+        digest = download_file(**download_this)
+        success = bool(digest)
 
-            download = False
-            if not tags_match:
-                download = True
-            elif not installed_matches:
-                download = True
-            elif force_download:
-                download = True
+        status = {"download_success": success, "filename": filename}
 
-            if not download:
-                continue
+        if success and "github" in values:
+            status["tag"] = tag
+        if success:
+            status["sha256"] = digest
+            status.update(remote_file_info)
+
+        return status
+
+    def download_objects(self):
+        # Download objects as defined in the config
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
+        for name, value in locals().items():
+            logging.debug("  %s: %s", name, value)
+
+        downloads = self.json_data.get(
+            "downloads", defaultdict(lambda: defaultdict(dict))
+        )
+
+        # With a token, look up every GitHub release in one GraphQL request up front
+        if len(self.github_api) > 1:
+            prefetch_github_releases(
+                [
+                    (values.get("github"), values.get("latest", True))
+                    for values in downloads.values()
+                    if "github" in values
+                ],
+                self.github_api,
+                self.github_cache,
+            )
 
-            success = download_file(**download_this)
+        # Each object is an independent, network-bound fetch, so run them side by side
+        with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+            futures = {
+                executor.submit(self.download_object, this_object, values): this_object
+                for this_object, values in downloads.items()
+            }
+
+            # Status is only recorded from this thread, so no locking is needed. Keep
+            # config order so the install order stays the same from run to run.
+            for future, this_object in futures.items():
+                status = future.result()
+                if not status:
+                    continue
+                self.downloads_status[this_object].update(status)
+
+    def extract_download(self, download_object, filename):
+        # Extract a downloaded archive into the installation directory, unless this exact archive is already installed
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
+        for name, value in locals().items():
+            logging.debug("  %s: %s", name, value)
+
+        file_path = self.downloads_directory / filename
+        marker_path = self.installed_marker_path(download_object)
+
+        # A re-downloaded archive with the same contents doesn't need extracting again
+        signature = self.downloads_status[download_object].get("sha256")
+        installed_signature = self.installed_versions.get(download_object, dict()).get(
+            "sha256"
+        )
+        if signature and signature == installed_signature and marker_path.exists():
+            logging.info(f"{filename} is already installed, skipping extraction")
+            return True
+
+        # Match a double extension such as .tar.zst before the last suffix alone
+        extractor = self.archive_extractors.get(
+            "".join(file_path.suffixes[-2:]).lower(),
+            self.archive_extractors.get(file_path.suffix.lower()),
+        )
+        if extractor:
+            extraction_success = extractor(file_path, self.installation_directory)
+        else:
+            logging.info(f"Cannot extract {filename}: unsupported archive type")
+            extraction_success = False
 
-            self.downloads_status[this_object]["download_success"] = success
-            self.downloads_status[this_object]["filename"] = filename
+        if extraction_success:
+            marker_path.parent.mkdir(parents=True, exist_ok=True)
+            marker_path.write_text(f"{filename}\n")
+        return extraction_success
 
-            if success and "github" in values:
-                self.downloads_status[this_object]["tag"] = tag
+    def installed_marker_path(self, download_object):
+        # Marker file showing an object's archive was extracted into this installation
+        safe_name = re.sub(r"[^\w.-]+", "_", download_object)
+        return self.installed_markers_directory / f"{safe_name}.ok"
 
     def install_downloads(self, single_target=False):
         # Install our downloaded items
-        logging.debug(f"...")
-        logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
         for name, value in locals().items():
-            logging.debug(f"  {name}: {value}")
+            logging.debug("  %s: %s", name, value)
 
+        to_install = list()
         for download_object, values in self.downloads_status.items():
             if not values.get("download_success", False):
                 continue
@@ -200,33 +353,41 @@ class cggOBS:
                 continue
 
             del self.downloads_status[download_object]["download_success"]
-
+            to_install.append(download_object)
+
+        # Every archive unpacks over the same installation tree, so they're extracted
+        # one at a time in config order and a file shipped by several archives ends
+        # up as the last one's copy. Large zips are still split across threads
+        # within extract_zip.
+        for download_object in to_install:
+            values = self.downloads_status[download_object]
             filename = values.get("filename")
             tag = values.get("tag", False)
-            file_path = Path(f"{self.downloads_directory}/{filename}")
-            filename_len = len(filename)
-            if filename[filename_len - 3 :].lower() == "zip":
-                extraction_success = extract_zip(file_path, self.installation_directory)
-            elif filename[filename_len - 2 :].lower() == "7z":
-                extraction_success = extract_7z(file_path, self.installation_directory)
-            else:
+
+            if not self.extract_download(download_object, filename):
                 self.downloads_status[download_object]["installed"] = False
-                extraction_success = False
+                continue
 
-            if extraction_success:
-                if not download_object in self.installed_versions:
-                    self.installed_versions[download_object] = dict()
-                self.installed_versions[download_object]["filename"] = filename
-                self.downloads_status[download_object]["installed"] = True
-                if tag:
-                    self.installed_versions[download_object]["tag"] = tag
+            if not download_object in self.installed_versions:
+                self.installed_versions[download_object] = dict()
+            self.installed_versions[download_object]["filename"] = filename
+            self.installed_versions[download_object]["sha256"] = values.get("sha256")
+            self.downloads_status[download_object]["installed"] = True
+            if tag:
+                self.installed_versions[download_object]["tag"] = tag
+            for key in ("content_length", "last_modified"):
+                if key in values:
+                    self.installed_versions[download_object][key] = values.get(key)
+
+            # Save after every install, so an interrupted run keeps what it finished
+            self.write_installed_versions()
 
     def load_obs_json(self, file_name):
         # Load the JSON from multiple possible sources
-        logging.debug(f"...")
-        logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
         for name, value in locals().items():
-            logging.debug(f"  {name}: {value}")
+            logging.debug("  %s: %s", name, value)
 
         result = defaultdict(lambda: defaultdict(dict))
         if os.path.exists(file_name):  # read a local file
@@ -234,67 +395,139 @@ class cggOBS:
         elif file_name.startswith("http://") or file_name.startswith(
             "https://"
         ):  # read from URL
-            result = read_json_from_url(file_name)
+            result = read_json_from_url(file_name, self.config_cache)
         elif file_name != "__invalid__":  # try reading from URL
-            result = read_json_from_url(f"http://{file_name}")
+            result = read_json_from_url(f"http://{file_name}", self.config_cache)
 
         if (
             not len(result) or file_name == "__invalid__"
         ):  # Use a default config if we have an empty result or no file was specified.
             url = f"https://raw.githubusercontent.com/Spafbi/cgg-obs/main/defaults.json"
-            result = read_json_from_url(url)
+            result = read_json_from_url(url, self.config_cache)
         return result
 
     def move_directories(self):
         # Some plugins down't extract cleanly - we fix that, here.
-        logging.debug(f"...")
-        logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
         for name, value in locals().items():
-            logging.debug(f"  {name}: {value}")
+            logging.debug("  %s: %s", name, value)
         moves = self.json_data.get("moves", dict())
         for key, value in moves.items():
             if not key in self.downloads_status:
                 continue
             source = str(Path(f"{self.installation_directory}/{value}"))
             target = str(Path(f"{self.installation_directory}"))
-            copy_directory_contents(source, target)
+            move_directory_contents(source, target)
 
             try:
                 shutil.rmtree(source)
-                logging.debug(f"Directory {source} removed successfully.")
+                logging.debug("Directory %s removed successfully.", source)
             except OSError as e:
                 logging.debug(f"Error occurred during removal of {source}: {e}")
 
+    def write_config_cache(self):
+        # Keep fetched config files for conditional requests on the next run
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
+        for name, value in locals().items():
+            logging.debug("  %s: %s", name, value)
+
+        if not self.config_cache:
+            return
+        write_dict_to_file(self.config_cache, self.config_cache_file)
+
     def write_download_status(self):
         # Save some download info for troubleshooting
-        logging.debug(f"...")
-        logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
         for name, value in locals().items():
-            logging.debug(f"  {name}: {value}")
+            logging.debug("  %s: %s", name, value)
 
         if not self.downloads_status:
             return
         file_name = Path(f"{self.downloads_directory}/downloads_{self.date_str}.log")
         write_dict_to_file(self.downloads_status, file_name)
 
+    def write_github_cache(self):
+        # Keep GitHub release responses for conditional requests on the next run
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
+        for name, value in locals().items():
+            logging.debug("  %s: %s", name, value)
+
+        if not self.github_cache:
+            return
+        write_dict_to_file(self.github_cache, self.github_cache_file)
+
     def write_installed_versions(self):
         # Record our installed versions
-        logging.debug(f"...")
-        logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
         for name, value in locals().items():
-            logging.debug(f"  {name}: {value}")
+            logging.debug("  %s: %s", name, value)
 
         if not self.installed_versions:
             return
         write_dict_to_file(self.installed_versions, self.installed_versions_file)
 
+    def write_obsproject_cache(self):
+        # Keep obsproject.com page listings for conditional requests on the next run
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
+        for name, value in locals().items():
+            logging.debug("  %s: %s", name, value)
+
+        if not self.obsproject_cache:
+            return
+        write_dict_to_file(self.obsproject_cache, self.obsproject_cache_file)
+
+
+@lru_cache(maxsize=256)
+def compile_filename_pattern(pattern):
+    """
+    Compiles a shell-style filename pattern once per run into a function which
+    tells whether a file name matches it. Matching ignores case, as fnmatch does
+    on Windows. Patterns using only "*" wildcards, which is all of ours, are
+    checked with plain string methods; "?" and "[...]" go through a regex.
+    """
+    if "?" in pattern or "[" in pattern:
+        return re.compile(translate(pattern), re.IGNORECASE).match
+
+    fragments = pattern.lower().split("*")
+    first = fragments[0]
+    last = fragments[-1]
+    middle = fragments[1:-1]
+    minimum_length = sum(len(fragment) for fragment in fragments)
+
+    def matches(name):
+        name = name.lower()
+        if len(fragments) == 1:
+            return name == first
+        if len(name) < minimum_length:
+            return False
+        if not (name.startswith(first) and name.endswith(last)):
+            return False
+
+        # The literal pieces between wildcards must appear in order, between the ends
+        position = len(first)
+        end = len(name) - len(last)
+        for fragment in middle:
+            position = name.find(fragment, position, end)
+            if position < 0:
+                return False
+            position += len(fragment)
+        return True
+
+    return matches
+
 
 def configure_logging(debug_mode):
     # set the log level based on the debug_mode argument
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
     for name, value in locals().items():
-        logging.debug(f"  {name}: {value}")
+        logging.debug("  %s: %s", name, value)
 
     if debug_mode:
         log_level = logging.DEBUG
@@ -326,24 +559,50 @@ def configure_logging(debug_mode):
     return True
 
 
+def create_http_session():
+    """
+    Creates a requests session which keeps connections alive between calls, so
+    repeat requests to GitHub, its download CDNs and obsproject.com skip the TCP
+    and TLS handshakes. Transient server errors are retried with a short backoff.
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+
+    session = requests.Session()
+    session.headers.update({"User-Agent": "cgg-obs"})
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 def create_shortcut(**kwargs):
     """
     Create a Windows application shortcut on the user's desktop.
     """
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
     for name, value in kwargs.items():
-        logging.debug(f"  {name}: {value}")
+        logging.debug("  %s: %s", name, value)
 
     bin_path = kwargs.get("binary_path")
     icon_path = kwargs.get("icon_path")
     shortcut_name = kwargs.get("shortcut_name")
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
     for name, value in locals().items():
-        logging.debug(f"  {name}: {value}")
+        logging.debug("  %s: %s", name, value)
 
     try:
+        # pywin32's COM machinery is slow to load and only needed here
+        from win32com.client import Dispatch
+        import winshell
+
         # Get the path to the user's desktop
         desktop = winshell.desktop()
 
@@ -371,11 +630,12 @@ def download_file(**kwargs):
     """
     Downloads a file from a given URL and saves it to a specified directory with a specified filename.
     An optional API key can be passed in to use in an authorization bearer header.
+    Returns the file's SHA-256 hex digest, hashed as it streams in, or False on failure.
     """
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
     for name, value in kwargs.items():
-        logging.debug(f"  {name}: {value}")
+        logging.debug("  %s: %s", name, value)
 
     github_api_key = kwargs.get("github_api_key", None)
     output_directory = kwargs.get("output_directory")
@@ -383,10 +643,10 @@ def download_file(**kwargs):
     url = kwargs.get("url")
     try:
         # log input values using logging module
-        logging.debug(f"...")
-        logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+        logging.debug("...")
+        logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
         for name, value in locals().items():
-            logging.debug(f"  {name}: {value}")
+            logging.debug("  %s: %s", name, value)
 
         headers = defaultdict(lambda: defaultdict(dict))
         if github_api_key:
@@ -395,24 +655,34 @@ def download_file(**kwargs):
                 "X-GitHub-Api-Version": "2022-11-28",
             }
 
-        # Download file from URL
-        response = requests.get(url, headers=headers)
-
-        if response.status_code != 200:
-            logging.debug(
-                f"Download URL not downloaded due to HTTP reponse code: {response.status_code}"
-            )
-            return False
+        # Download file from URL, streaming the body rather than holding it in memory
+        with http_session.get(url, headers=headers, stream=True, timeout=60) as response:
+            if response.status_code != 200:
+                logging.debug(
+                    f"Download URL not downloaded due to HTTP reponse code: {response.status_code}"
+                )
+                return False
 
-        # Save file to specified directory with specified filename
-        filepath = os.path.join(output_directory, output_filename)
-        with open(filepath, "wb") as file:
-            file.write(response.content)
+            # Save file to specified directory with specified filename. Chunks go to
+            # a partial file which only replaces the target once complete.
+            filepath = os.path.join(output_directory, output_filename)
+            partial_filepath = f"{filepath}.part"
+            digest = hashlib.sha256()
+            try:
+                with open(partial_filepath, "wb") as file:
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
+                        file.write(chunk)
+                        digest.update(chunk)
+                os.replace(partial_filepath, filepath)
+            finally:
+                # Don't leave a truncated partial file behind if the download failed
+                if os.path.exists(partial_filepath):
+                    os.remove(partial_filepath)
 
         logging.info(f"{output_filename} downloaded successfully!")
-        return True
+        return digest.hexdigest()
 
-    except Exception as e:
+    except (requests.RequestException, OSError) as e:
         logging.info(f"Error occurred while downloading {output_filename}: {e}")
         logging.error(f"Error occurred while downloading {output_filename}: {e}")
         return False
@@ -420,22 +690,21 @@ def download_file(**kwargs):
 
 def download_json(url):
     # Download a JSON file and return it as a dictionary
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
     for name, value in locals().items():
-        logging.debug(f"  {name}: {value}")
+        logging.debug("  %s: %s", name, value)
 
     try:
-        response = requests.get(url)
-    except Exception as e:
+        response = http_session.get(url, timeout=30)
+    except requests.RequestException as e:
         logging.info(
             "Could not download URL. Installation halted."
         )
         logging.info(e)
         exit(1)
 
-    json_data = response.text
-    return json.loads(json_data)
+    return parse_json(response.content)
 
 
 def extract_zip(zip_filepath, extraction_directory):
@@ -447,10 +716,10 @@ def extract_zip(zip_filepath, extraction_directory):
     :param extraction_directory: The file path of the directory to extract the zip to.
     :type extraction_directory: str
     """
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
     for name, value in locals().items():
-        logging.debug(f"  {name}: {value}")
+        logging.debug("  %s: %s", name, value)
 
     try:
         # Check if zip file exists
@@ -461,9 +730,46 @@ def extract_zip(zip_filepath, extraction_directory):
         if not os.path.exists(extraction_directory):
             os.makedirs(extraction_directory)
 
-        # Extract contents of zip file to extraction directory
-        with zipfile.ZipFile(zip_filepath, "r") as zip:
-            zip.extractall(path=extraction_directory)
+        # Work with plain strings in the member loop; Path objects per entry add up
+        target_directory = os.fspath(extraction_directory)
+
+        with zipfile.ZipFile(zip_filepath, "r", allowZip64=True) as zip:
+            # One pass resolves every output path and the directories needed
+            files = []
+            directories = set()
+            add_file = files.append
+            add_directory = directories.add
+            member_path_for = get_zip_member_path
+            path_dirname = os.path.dirname
+            for member in zip.infolist():
+                member_path = member_path_for(target_directory, member.filename)
+                if member.is_dir():
+                    add_directory(member_path)
+                else:
+                    add_directory(path_dirname(member_path))
+                    add_file((member, member_path))
+
+        # Create every directory up front, once each, shallowest first
+        for directory in sorted(directories, key=len):
+            os.makedirs(directory, exist_ok=True)
+
+        # zlib inflates outside the GIL, so large archives (OBS itself has thousands
+        # of members) are split across threads. ZipFile serializes reads on a shared
+        # handle, so each worker opens the archive itself. Members are dealt out
+        # largest first so the workers finish at about the same time.
+        workers = min(os.cpu_count() or 1, max(1, len(files) // 64))
+        if workers == 1:
+            extract_zip_members(zip_filepath, files)
+        else:
+            files.sort(key=lambda file: file[0].compress_size, reverse=True)
+            shards = [files[index::workers] for index in range(workers)]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                extractions = [
+                    executor.submit(extract_zip_members, zip_filepath, shard)
+                    for shard in shards
+                ]
+            for extraction in extractions:
+                extraction.result()
 
         logging.info(f"Successfully extracted zip file to {extraction_directory}")
         return True
@@ -473,20 +779,53 @@ def extract_zip(zip_filepath, extraction_directory):
         return False
 
 
-def extract_7z(archive_filepath, extraction_directory):
+def extract_zip_members(zip_filepath, members):
+    """
+    Writes the given members of a zip file out to their already resolved paths,
+    using its own handle on the archive so several calls can run at once.
+
+    :param zip_filepath: The file path of the zip file to read.
+    :type zip_filepath: str
+    :param members: (ZipInfo, output path) pairs; their directories must exist.
+    :type members: list
+    """
+    with open(zip_filepath, "rb") as zip_file:
+        # Map the archive so zlib reads straight from the page cache. 32-bit
+        # builds can't map a multi-GB OBS archive, so they keep buffered reads.
+        zip_source = zip_file
+        if sys.maxsize > 2**32:
+            zip_source = archiveMap(zip_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                zip_source.madvise(mmap.MADV_SEQUENTIAL)
+
+        try:
+            with zipfile.ZipFile(zip_source, "r", allowZip64=True) as zip:
+                for member, member_path in members:
+                    with zip.open(member) as source, open(member_path, "wb") as target:
+                        # Copy in 1 MiB blocks; the default is 64 KiB outside Windows
+                        shutil.copyfileobj(source, target, 1024 * 1024)
+        finally:
+            if zip_source is not zip_file:
+                zip_source.close()
+
+
+def extract_7z(archive_filepath, extraction_directory, use_native=True):
     """
-    Extracts the contents of a 7z archive file to a target extraction directory
-    using py7zr.
+    Extracts the contents of a 7z archive file to a target extraction directory.
+    A 7-Zip command line binary found on the PATH is used when available, as it
+    decodes with multiple threads; otherwise, or if it fails, py7zr is used.
 
     :param archive_filepath: The file path of the 7z archive file to extract.
     :type archive_filepath: str
     :param extraction_directory: The file path of the directory to extract the 7z archive to.
     :type extraction_directory: str
+    :param use_native: Whether to try a native 7-Zip binary before py7zr.
+    :type use_native: bool
     """
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
     for name, value in locals().items():
-        logging.debug(f"  {name}: {value}")
+        logging.debug("  %s: %s", name, value)
 
     try:
         # Check if archive file exists
@@ -497,6 +836,32 @@ def extract_7z(archive_filepath, extraction_directory):
         if not os.path.exists(extraction_directory):
             os.makedirs(extraction_directory)
 
+        # Prefer a native 7-Zip binary if one is installed
+        seven_zip = (shutil.which("7z") or shutil.which("7za")) if use_native else None
+        if seven_zip:
+            result = subprocess.run(
+                [
+                    seven_zip,
+                    "x",
+                    "-y",
+                    "-mmt=on",
+                    f"-o{extraction_directory}",
+                    str(archive_filepath),
+                ],
+                capture_output=True,
+            )
+            if result.returncode == 0:
+                logging.info(
+                    f"Successfully extracted 7z archive to {extraction_directory}"
+                )
+                return True
+            logging.debug(
+                f"{seven_zip} exited with code {result.returncode}, falling back to py7zr: {result.stderr}"
+            )
+
+        # py7zr and its codecs are only loaded when there's no native 7-Zip to use
+        import py7zr
+
         # Extract contents of archive file to extraction directory
         with py7zr.SevenZipFile(archive_filepath, mode="r") as archive:
             archive.extractall(path=extraction_directory)
@@ -510,53 +875,80 @@ def extract_7z(archive_filepath, extraction_directory):
         return False
 
 
-def get_github_project_download_url(github_path, file_pattern, latest, api_key=""):
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
-    for name, value in locals().items():
-        logging.debug(f"  {name}: {value}")
+def extract_tar_zst(archive_filepath, extraction_directory):
+    """
+    Extracts the contents of a zstandard-compressed tarball (.tar.zst) to a target
+    extraction directory. The archive is decompressed and unpacked in one streaming
+    pass; only regular files and directories are extracted.
 
-    if latest:
-        page_url = f"https://api.github.com/repos/{github_path}/releases/latest"
-    else:
-        page_url = f"https://api.github.com/repos/{github_path}/releases"
+    :param archive_filepath: The file path of the .tar.zst archive to extract.
+    :type archive_filepath: str
+    :param extraction_directory: The file path of the directory to extract the archive to.
+    :type extraction_directory: str
+    """
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
+    for name, value in locals().items():
+        logging.debug("  %s: %s", name, value)
 
-    headers = defaultdict(lambda: defaultdict(dict))
-    if len(api_key) > 1:
-        headers = {
-            "Accept": "application/vnd.github+json",
-            "Authorization": f"Bearer {api_key}",
-            "X-GitHub-Api-Version": "2022-11-28",
-        }
+    if not zstandard:
+        logging.info(
+            f"Cannot extract {archive_filepath}: the zstandard module is not installed"
+        )
+        return False
 
     try:
-        response = requests.get(page_url, headers=headers)
-    except Exception as e:
-        logging.debug(e)
-        return False, False, False
+        target_directory = os.fspath(extraction_directory)
+        os.makedirs(target_directory, exist_ok=True)
+
+        with open(archive_filepath, "rb") as archive_file:
+            reader = zstandard.ZstdDecompressor().stream_reader(archive_file)
+            with tarfile.open(fileobj=reader, mode="r|") as archive:
+                for member in archive:
+                    # Paths are cleaned the same way as zip members; links and
+                    # device entries are never needed for OBS and are skipped
+                    member_path = get_zip_member_path(target_directory, member.name)
+                    if member.isdir():
+                        os.makedirs(member_path, exist_ok=True)
+                    elif member.isfile():
+                        os.makedirs(os.path.dirname(member_path), exist_ok=True)
+                        with archive.extractfile(member) as source, open(
+                            member_path, "wb"
+                        ) as target:
+                            shutil.copyfileobj(source, target, 1024 * 1024)
+
+        logging.info(f"Successfully extracted tarball to {extraction_directory}")
+        return True
 
-    if response.status_code != 200:
-        logging.debug(
-            f"Download URL not identified due to HTTP reponse code: {response.status_code}"
-        )
+    except (OSError, tarfile.TarError, zstandard.ZstdError) as e:
+        logging.info(f"Error occurred while extracting tarball {archive_filepath}: {e}")
+        return False
 
-        return False, False, False
 
-    json_data = response.text
+def get_github_project_download_url(
+    github_path, file_pattern, latest, api_key="", cache=None
+):
+    # Find the release asset matching file_pattern for a GitHub project
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
+    for name, value in locals().items():
+        logging.debug("  %s: %s", name, value)
 
-    if latest:
-        json_data = json.loads(json_data)
-    else:
-        json_data = json.loads(json_data)[0]
+    json_data = get_github_release(github_path, latest, api_key, cache)
+    if not json_data:
+        return False, False, False
+
+    is_pdbs = compile_filename_pattern("OBS-Studio-*-pdbs.zip")
+    is_wanted_asset = compile_filename_pattern(file_pattern)
 
     for asset in json_data.get("assets", dict()):
-        this_asset_name = asset.get("name")
+        this_asset_name = asset.get("name") or ""
 
         # One-off to skip grabbing OBS pdbs - needed as fnmatch doesn't support real regex
-        if fnmatch(this_asset_name, "OBS-Studio-*-pdbs.zip"):
+        if is_pdbs(this_asset_name):
             continue
-            
-        if fnmatch(this_asset_name, file_pattern):
+
+        if is_wanted_asset(this_asset_name):
             return (
                 asset.get("browser_download_url"),
                 this_asset_name,
@@ -566,70 +958,290 @@ def get_github_project_download_url(github_path, file_pattern, latest, api_key="
     return False, False, False
 
 
-def get_obs_project_download_url(obsproject_path, file_pattern):
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+def get_github_release(github_path, latest, api_key="", cache=None):
+    """
+    Returns the latest (or newest, when latest is False) release of a GitHub
+    project as a dictionary, or False if it could not be retrieved.
+
+    Releases are remembered for the rest of the run, so objects sharing a
+    repository cost one API call. When a cache dictionary is passed, the
+    response's ETag and Last-Modified values are kept in it by URL and sent back
+    on the next run; a 304 reply then reuses the cached release JSON without
+    transferring it again. A release GitHub confirmed within the last hour is
+    reused without asking at all.
+    """
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
+    for name, value in locals().items():
+        logging.debug("  %s: %s", name, value)
+
+    page_url = get_github_release_url(github_path, latest)
+    if page_url in github_releases:
+        return github_releases[page_url]
+
+    cache = cache if cache is not None else dict()
+    cached = cache.get(page_url, dict())
+    if github_cache_is_fresh(cached):
+        json_data = cached.get("body")
+    else:
+        json_data = get_github_release_body(page_url, api_key, cache)
+    if not json_data:
+        return False
+
+    if latest:
+        json_data = parse_json(json_data)
+    else:
+        json_data = parse_json(json_data)[0]
+
+    github_releases[page_url] = json_data
+    return json_data
+
+
+def get_github_release_body(page_url, api_key, cache):
+    """
+    Requests a GitHub REST release URL and returns the response body, or False.
+    Validators from an earlier response in the cache are sent along, and a 304
+    reply, or running out of API quota, falls back to the cached body.
+    """
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
+    for name, value in locals().items():
+        logging.debug("  %s: %s", name, value)
+
+    # Always ask for the versioned JSON media type, token or not
+    headers = {
+        "Accept": "application/vnd.github+json",
+        "X-GitHub-Api-Version": "2022-11-28",
+    }
+    if len(api_key) > 1:
+        headers["Authorization"] = f"Bearer {api_key}"
+
+    cached = cache.get(page_url, dict())
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached.get("etag")
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached.get("last_modified")
+
+    try:
+        response = http_session.get(page_url, headers=headers, timeout=30)
+    except requests.RequestException as e:
+        logging.debug(e)
+        return False
+
+    rate_limited = response.headers.get("X-RateLimit-Remaining") == "0"
+    if response.status_code == 304:
+        cached["checked"] = time.time()
+        return cached.get("body")
+    elif response.status_code == 200:
+        # A fresh response is kept even if it used up the last of the quota
+        cache[page_url] = {
+            "body": response.text,
+            "checked": time.time(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        return response.text
+    elif rate_limited and cached.get("body"):
+        # Out of API quota; use what we saw last time rather than retrying
+        reset = response.headers.get("X-RateLimit-Reset", "unknown")
+        logging.info(
+            f"GitHub API rate limit reached (resets at {reset}); using cached release info for {page_url}"
+        )
+        return cached.get("body")
+
+    logging.debug(
+        f"Download URL not identified due to HTTP reponse code: {response.status_code}"
+    )
+    return False
+
+
+def get_github_release_url(github_path, latest):
+    # The REST API URL for a project's latest release, or for its release list
+    if latest:
+        return f"https://api.github.com/repos/{github_path}/releases/latest"
+    return f"https://api.github.com/repos/{github_path}/releases"
+
+
+def get_obs_project_download_url(obsproject_path, file_pattern, cache=None):
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
     for name, value in locals().items():
-        logging.debug(f"  {name}: {value}")
+        logging.debug("  %s: %s", name, value)
+
+    # Match the pattern against the files listed on the resource's download page
+    is_wanted_file = compile_filename_pattern(file_pattern)
+    for file_name, download_url in get_obs_project_files(obsproject_path, cache):
+        if is_wanted_file(file_name):
+            return download_url, file_name
+    return False, False
+
+
+def get_obs_project_files(obsproject_path, cache=None):
+    """
+    Returns a list of (file name, download URL) pairs from an obsproject.com
+    resource's download page. Parsed pages are reused for ten minutes, so repeat
+    lookups of the same resource don't fetch and parse the HTML again.
+
+    When a cache dictionary is passed, the page's Last-Modified and ETag values
+    are kept in it by URL along with the parsed list, and sent back on the next
+    run; a 304 reply then reuses that list without downloading or parsing the page.
+    """
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
+    for name, value in locals().items():
+        logging.debug("  %s: %s", name, value)
+
+    if obsproject_path in obsproject_pages:
+        fetched_at, files = obsproject_pages[obsproject_path]
+        if time.monotonic() - fetched_at < 600:
+            return files
 
     page_url = f"https://obsproject.com/forum/resources/{obsproject_path}/download"
+
+    headers = dict()
+    cached = cache.get(page_url, dict()) if cache is not None else dict()
+    if cached.get("files"):
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached.get("last_modified")
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached.get("etag")
+
     # Fetch the webpage
     try:
-        response = requests.get(page_url)
-    except Exception as e:
+        response = http_session.get(page_url, headers=headers, timeout=30)
+    except requests.RequestException as e:
         logging.debug(e)
-        return False, False
+        return list()
+
+    # Unchanged since last run; the list we parsed then still applies
+    if response.status_code == 304 and cached.get("files"):
+        files = [tuple(file_info) for file_info in cached.get("files")]
+        obsproject_pages[obsproject_path] = (time.monotonic(), files)
+        return files
 
     # If the request was successful, the status code will be 200
     if response.status_code != 200:
         logging.debug(
             f"Download URL not identified due to HTTP reponse code: {response.status_code}"
         )
-        return False, False
+        return list()
 
     # Get the content of the response
     page_content = response.content
 
-    # Create a BeautifulSoup object and specify the parser
-    soup = BeautifulSoup(page_content, "html.parser")
+    # bs4 is only loaded when a page actually needs parsing, not on cached runs
+    from bs4 import BeautifulSoup
 
-    # Find all elements with class "contentRow-title"
-    file_elements = soup.find_all(class_="contentRow-title")
+    # Create a BeautifulSoup object and specify the parser
+    soup = BeautifulSoup(page_content, html_parser)
 
-    # For each element, get the text and match with the pattern
-    for file_element in file_elements:
+    # Find all elements with class "contentRow-title", and the download link for each
+    files = list()
+    for file_element in soup.find_all(class_="contentRow-title"):
         file_name = file_element.get_text().strip()
-        if fnmatch(file_name, file_pattern):
-            # If the filename matches the pattern, get the download link
-            download_link = file_element.find_previous(
-                "a", {"class": "button--icon--download"}
-            )
-            if download_link is not None:
-                download_url = download_link["href"]
-                # Return the full download URL, not just the path
-                return requests.compat.urljoin(page_url, download_url), file_name
-    return False, False
+        download_link = file_element.find_previous(
+            "a", {"class": "button--icon--download"}
+        )
+        if download_link is not None:
+            download_url = download_link["href"]
+            # Keep the full download URL, not just the path
+            files.append((file_name, requests.compat.urljoin(page_url, download_url)))
+
+    obsproject_pages[obsproject_path] = (time.monotonic(), files)
+    if cache is not None:
+        last_modified = response.headers.get("Last-Modified")
+        etag = response.headers.get("ETag")
+        if last_modified or etag:
+            cache[page_url] = {
+                "etag": etag,
+                "files": files,
+                "last_modified": last_modified,
+            }
+    return files
+
+
+def get_remote_file_info(url):
+    """
+    Returns the Content-Length and Last-Modified a server reports for a URL, using
+    a HEAD request so the file itself isn't transferred. Headers the server doesn't
+    send are left out; an empty dictionary means nothing could be determined.
+    """
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
+    for name, value in locals().items():
+        logging.debug("  %s: %s", name, value)
+
+    try:
+        response = http_session.head(url, allow_redirects=True, timeout=10)
+    except requests.RequestException as e:
+        logging.debug(e)
+        return dict()
+
+    if response.status_code != 200:
+        logging.debug(f"HEAD request returned HTTP response code: {response.status_code}")
+        return dict()
+
+    file_info = dict()
+    if response.headers.get("Content-Length"):
+        file_info["content_length"] = response.headers.get("Content-Length")
+    if response.headers.get("Last-Modified"):
+        file_info["last_modified"] = response.headers.get("Last-Modified")
+    return file_info
+
+
+def get_zip_member_path(target_directory, member_name):
+    """
+    Returns the path a zip member should be written to, dropping absolute
+    prefixes, drive letters and ".." components the same way ZipFile.extract does.
+    """
+    # Nearly every member name is already safe, so skip the component scan for those
+    if not (
+        ".." in member_name
+        or ":" in member_name
+        or member_name.startswith(("/", "\\"))
+    ):
+        return os.path.join(
+            target_directory, member_name.rstrip("/").replace("/", os.sep)
+        )
+
+    member_name = member_name.replace("/", os.sep)
+    if os.path.altsep:
+        member_name = member_name.replace(os.path.altsep, os.sep)
+    member_name = os.path.splitdrive(member_name)[1]
+    parts = [
+        part
+        for part in member_name.split(os.sep)
+        if part not in ("", os.curdir, os.pardir)
+    ]
+    return os.path.join(target_directory, *parts)
+
+
+def github_cache_is_fresh(cached):
+    # Release info GitHub confirmed within the last hour is reused without asking again
+    if not cached.get("body"):
+        return False
+    return time.time() - cached.get("checked", 0) < github_release_max_age
 
 
 def make_dir(directory):
     """
     Moves a directory from src_dir to dest_dir.
     """
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
     for name, value in locals().items():
-        logging.debug(f"  {name}: {value}")
+        logging.debug("  %s: %s", name, value)
 
     if not os.path.exists(directory):
         os.makedirs(directory)
 
 
-def copy_directory_contents(source_dir, destination_dir):
-    # Move the contents of one directory to another
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+def move_directory_contents(source_dir, destination_dir):
+    # Move the contents of one directory to another by renaming, merging into existing directories
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
     for name, value in locals().items():
-        logging.debug(f"  {name}: {value}")
+        logging.debug("  %s: %s", name, value)
 
     source_dir = str(Path(source_dir))
     destination_dir = str(Path(destination_dir))
@@ -646,39 +1258,149 @@ def copy_directory_contents(source_dir, destination_dir):
             logging.debug("Error creating destination directory.")
             return
 
-    # Get a list of all files and directories in the source directory
+    # Go through all files and directories in the source directory. scandir hands
+    # back each entry's type with the listing, so the source needs no extra stat;
+    # the listing is taken up front as entries are moved out while we go.
     try:
-        for item in os.listdir(source_dir):
-            # Get the full path of the item
-            item_path = os.path.join(source_dir, item)
+        with os.scandir(source_dir) as entries:
+            entries = list(entries)
+        for entry in entries:
+            # Get the full paths of the item
+            item_path = entry.path
+            destination_path = os.path.join(destination_dir, entry.name)
+
+            # Directories present on both sides are merged; everything else is a
+            # single rename, which is O(1) as source and destination share a volume.
+            # The destination is stat'ed once per entry.
+            destination_is_dir = os.path.isdir(destination_path)
+            if destination_is_dir and entry.is_dir(follow_symlinks=False):
+                move_directory_contents(item_path, destination_path)
+                continue
 
-            # Check if it is a file
-            if os.path.isfile(item_path):
-                # Copy the file to the destination directory
+            try:
+                if destination_is_dir:
+                    shutil.rmtree(destination_path)
                 try:
-                    shutil.copy(item_path, destination_dir)
-                except shutil.Error as e:
-                    logging.debug(f"Failed to copy file: {item_path}. Error: {e}")
-            else:
-                # Recursively copy the directory to the destination directory
-                destination_subdir = os.path.join(destination_dir, item)
-                copy_directory_contents(item_path, destination_subdir)
+                    os.replace(item_path, destination_path)
+                except OSError as e:
+                    # A rename can't cross volumes (e.g. a junctioned folder inside
+                    # the installation); copy and delete in that case
+                    if e.errno != errno.EXDEV:
+                        raise
+                    shutil.move(item_path, destination_path)
+            except OSError as e:
+                logging.debug(f"Failed to move: {item_path}. Error: {e}")
 
-        logging.debug("Contents copied successfully.")
+        logging.debug("Contents moved successfully.")
     except OSError as e:
         logging.debug(f"Error accessing source directory: {e}")
 
-    # Delete the directory
-    # os.chmod(source_dir, stat.S_IWRITE)
-    # os.rmdir(source_dir)
+
+def parse_json(data):
+    # Parse JSON text or bytes, with orjson when it's installed
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def prefetch_github_releases(releases, api_key, cache=None):
+    """
+    Fetches several GitHub releases with one GraphQL query and remembers them
+    for the run the same way get_github_release does, so the per-object lookups
+    that follow need no API calls. GraphQL requires a token; anything that can't
+    be fetched here is left for get_github_release to request over REST.
+
+    :param releases: (github_path, latest) pairs to fetch.
+    :type releases: list
+    :param api_key: GitHub personal access token.
+    :type api_key: str
+    :param cache: Cached REST responses by URL; releases checked recently are skipped.
+    :type cache: dict
+    """
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
+    for name, value in locals().items():
+        logging.debug("  %s: %s", name, value)
+
+    cache = cache if cache is not None else dict()
+    releases = [
+        (github_path, latest)
+        for github_path, latest in dict.fromkeys(releases)
+        if get_github_release_url(github_path, latest) not in github_releases
+        and not github_cache_is_fresh(
+            cache.get(get_github_release_url(github_path, latest), dict())
+        )
+    ]
+    if not releases:
+        return
+
+    # One aliased repository field per release, with owner/name passed as variables
+    release_fields = "tagName releaseAssets(first: 100) { nodes { name downloadUrl } }"
+    definitions = list()
+    fields = list()
+    variables = dict()
+    for index, (github_path, latest) in enumerate(releases):
+        owner, _, name = github_path.partition("/")
+        variables[f"owner{index}"] = owner
+        variables[f"name{index}"] = name
+        definitions.append(f"$owner{index}: String!, $name{index}: String!")
+        if latest:
+            selection = f"latestRelease {{ {release_fields} }}"
+        else:
+            selection = f"releases(first: 1, orderBy: {{field: CREATED_AT, direction: DESC}}) {{ nodes {{ {release_fields} }} }}"
+        fields.append(
+            f"r{index}: repository(owner: $owner{index}, name: $name{index}) {{ {selection} }}"
+        )
+    query = f"query({', '.join(definitions)}) {{ {' '.join(fields)} }}"
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "X-GitHub-Api-Version": "2022-11-28",
+    }
+
+    try:
+        response = http_session.post(
+            "https://api.github.com/graphql",
+            headers=headers,
+            json={"query": query, "variables": variables},
+            timeout=30,
+        )
+        data = parse_json(response.content).get("data") or dict()
+    except (requests.RequestException, ValueError) as e:
+        logging.debug(f"GitHub GraphQL release lookup failed: {e}")
+        return
+
+    for index, (github_path, latest) in enumerate(releases):
+        repository = data.get(f"r{index}") or dict()
+        if latest:
+            release = repository.get("latestRelease")
+        else:
+            release = next(
+                iter((repository.get("releases") or dict()).get("nodes") or list()),
+                None,
+            )
+        if not release:
+            continue
+
+        # Store it in the shape of the REST API's release JSON
+        github_releases[get_github_release_url(github_path, latest)] = {
+            "assets": [
+                {
+                    "browser_download_url": asset.get("downloadUrl"),
+                    "name": asset.get("name"),
+                }
+                for asset in release.get("releaseAssets", dict()).get("nodes", list())
+            ],
+            "tag_name": release.get("tagName"),
+        }
 
 
 def read_file_line(filename, line_number=1):
     # If a file can be read, return the specified line of a file's contents. Return False if it cannot be read or the line number isn't found.
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
     for name, value in locals().items():
-        logging.debug(f"  {name}: {value}")
+        logging.debug("  %s: %s", name, value)
 
     try:
         with open(filename, "r") as f:
@@ -694,12 +1416,15 @@ def read_file_line(filename, line_number=1):
 
 def read_json_file(filename):
     # read a JSON file
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
     for name, value in locals().items():
-        logging.debug(f"  {name}: {value}")
+        logging.debug("  %s: %s", name, value)
 
     try:
+        if orjson:
+            with open(filename, "rb") as f:
+                return orjson.loads(f.read())
         with open(filename) as f:
             data = json.load(f)
             return data
@@ -711,22 +1436,39 @@ def read_json_file(filename):
     return defaultdict(lambda: defaultdict(dict))
 
 
-def read_json_from_url(url):
-    # read JSON from a URL:
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+def read_json_from_url(url, cache=None):
+    # read JSON from a URL. With a cache dictionary, the last response's validators
+    # are sent along and a 304 reply reuses the cached body.
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
     for name, value in locals().items():
-        logging.debug(f"  {name}: {value}")
+        logging.debug("  %s: %s", name, value)
+
+    headers = dict()
+    cached = cache.get(url, dict()) if cache is not None else dict()
+    if cached.get("body"):
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached.get("etag")
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached.get("last_modified")
 
     try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = json.loads(response.text)
+        response = http_session.get(url, headers=headers, timeout=30)
+        if response.status_code == 304 and cached.get("body"):
+            return parse_json(cached.get("body"))
+        elif response.status_code == 200:
+            data = parse_json(response.content)
+            if cache is not None:
+                cache[url] = {
+                    "body": response.text,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
             return data
         else:
             return defaultdict(lambda: defaultdict(dict))
 
-    except Exception as e:
+    except (requests.RequestException, ValueError) as e:
         logging.debug(f"An error occurred: {e}")
         return defaultdict(lambda: defaultdict(dict))
 
@@ -743,10 +1485,10 @@ def write_dict_to_file(dictionary, file_path):
     :raises FileExistsError: If the file path already exists as a file.
     :raises IOError: If there was a problem writing the file.
     """
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
     for name, value in locals().items():
-        logging.debug(f"  {name}: {value}")
+        logging.debug("  %s: %s", name, value)
 
     try:
         # Check if file path directory exists
@@ -758,10 +1500,30 @@ def write_dict_to_file(dictionary, file_path):
         # if os.path.isfile(file_path):
         #     raise FileExistsError(f"File already exists at {file_path}")
 
-        # Write dictionary to file
-        with open(file_path, "w") as f:
-            json.dump(dictionary, f, indent=4, sort_keys=True)
-        logging.debug(f"Successfully wrote dictionary to JSON file at {file_path}")
+        # Write dictionary to a temporary file, then swap it into place so an
+        # interrupted run never leaves a half-written file behind
+        temp_file_path = f"{file_path}.tmp"
+        try:
+            # orjson can only indent by two spaces, so the json fallback matches it
+            if orjson:
+                with open(temp_file_path, "wb") as f:
+                    f.write(
+                        orjson.dumps(
+                            dictionary,
+                            option=orjson.OPT_INDENT_2
+                            | orjson.OPT_NON_STR_KEYS
+                            | orjson.OPT_SORT_KEYS,
+                        )
+                    )
+            else:
+                with open(temp_file_path, "w") as f:
+                    json.dump(dictionary, f, indent=2, sort_keys=True)
+            os.replace(temp_file_path, file_path)
+        finally:
+            # Don't leave a partly written temporary file behind if the dump failed
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+        logging.debug("Successfully wrote dictionary to JSON file at %s", file_path)
     except FileNotFoundError as e:
         logging.info(f"Error occurred: {e}")
     except FileExistsError as e:
@@ -770,15 +1532,28 @@ def write_dict_to_file(dictionary, file_path):
         logging.info(f"Error occurred while writing JSON file: {e}")
 
 
+# Shared by every network helper so connections are pooled across calls and threads
+http_session = create_http_session()
+
+# GitHub releases already fetched during this run, by API URL
+github_releases = dict()
+
+# How long, in seconds, a release GitHub has confirmed is trusted without asking again
+github_release_max_age = 3600
+
+# obsproject.com download pages parsed recently, as (fetch time, files) by resource path
+obsproject_pages = dict()
+
+
 # The "main" method
 def main():
     """
     Summary: Default method if this modules is run as __main__.
     """
-    logging.debug(f"...")
-    logging.debug(f"Executing function: {inspect.stack()[0][3]}")
+    logging.debug("...")
+    logging.debug("Executing function: %s", sys._getframe().f_code.co_name)
     for name, value in locals().items():
-        logging.debug(f"  {name}: {value}")
+        logging.debug("  %s: %s", name, value)
 
     # This just grabs our script's path for reuse
     script_path = os.path.abspath(os.path.dirname(sys.argv[0]))
@@ -848,7 +1623,7 @@ def main():
     # Check for files used to trigger debug logging, or use args.verbose setting
     verbose = (
         True
-        if len(glob(str(Path(f"{script_path}/{debug_filename_pattern}"))))
+        if next(iglob(str(Path(f"{script_path}/{debug_filename_pattern}"))), None)
         else args.verbose
     )
 
@@ -865,6 +1640,7 @@ def main():
 
     config = {
         "branding": args.branding,
+        "download_workers": download_workers,
         "downloads": args.downloads,
         "github_api_key": github_api_key,
         "github_config_file": github_config_file,
@@ -875,18 +1651,23 @@ def main():
 
     this_obs_install = cggOBS(**config)
 
-    variables = vars(this_obs_install)
-    for name, value in variables.items():
-        logging.debug(f"  {name}: {value}")
+    # Formatting the whole object (config, versions, caches) is costly, so only
+    # do it when the output will actually be logged
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        variables = vars(this_obs_install)
+        for name, value in variables.items():
+            logging.debug("  %s: %s", name, value)
 
     make_dir(this_obs_install.installation_directory)
     make_dir(this_obs_install.downloads_directory)
 
     this_obs_install.download_objects()
     this_obs_install.write_download_status()
+    this_obs_install.write_config_cache()
+    this_obs_install.write_github_cache()
+    this_obs_install.write_obsproject_cache()
     this_obs_install.install_downloads("OBS")
     this_obs_install.install_downloads()
-    this_obs_install.write_installed_versions()
     this_obs_install.move_directories()
     this_obs_install.download_icon()
 
@@ -906,5 +1687,6 @@ if __name__ == "__main__":
     github_api_text_filename = "github_api.txt"
     github_config_file = "defaults.json"
     github_project = "Spafbi/cgg-obs"
+    download_workers = 8
 
     main()